@@ -14,6 +14,54 @@ import scipy.sparse as sp
 import scipy.sparse.linalg as spla
 import numpy as np
 
+try:
+    from scipy.sparse import _sparsetools  # scipy >= 1.8
+except ImportError:
+    from scipy.sparse import sparsetools as _sparsetools
+
+try:
+    import solver_ext  # Cython/OpenMP kernels (optional, see setup_ext.py)
+except ImportError:
+    solver_ext = None
+
+try:
+    import solver_jit  # numba-compiled kernels (optional)
+except ImportError:
+    solver_jit = None
+
+# fastest available compiled assembly backend (None -> NumPy fallback)
+_assembly_backend = solver_ext if solver_ext is not None else solver_jit
+
+# local node pairs of edge ids 1..3 (row edge_id-1)
+_EDGE_LOCAL = np.array([[0, 1],   # edge 1: local nodes 0-1
+                        [1, 2],   # edge 2: local nodes 1-2
+                        [2, 0]],  # edge 3: local nodes 2-0
+                       dtype=np.intp)
+
+
+def _coo_to_csr(rows, cols, data, nnodes):
+    """
+    Convert COO triplets directly to CSR with the C kernel,
+    skipping the coo_matrix wrapper and its extra validation pass.
+    Duplicate entries (shared nodes) are summed once on the CSR side.
+    """
+    assert nnodes < 2 ** 31, "int32 sparse indices assume < 2^31 dofs"
+    nnz = data.size
+    idx_dtype = np.int32 if nnz < np.iinfo(np.int32).max else np.int64
+    rows = np.ascontiguousarray(rows, dtype=idx_dtype)
+    cols = np.ascontiguousarray(cols, dtype=idx_dtype)
+    data = np.ascontiguousarray(data, dtype=np.float64)
+
+    indptr = np.empty(nnodes + 1, dtype=idx_dtype)
+    indices = np.empty(nnz, dtype=idx_dtype)
+    data_csr = np.empty(nnz, dtype=np.float64)
+    _sparsetools.coo_tocsr(nnodes, nnodes, nnz,
+                           rows, cols, data,
+                           indptr, indices, data_csr)
+    K = sp.csr_matrix((data_csr, indices, indptr), shape=(nnodes, nnodes))
+    K.sum_duplicates()  # single fused sort+sum pass in C
+    return K
+
 
 def element_stiffness_triangle(node_coords, k=1.0):
     """
@@ -24,20 +72,102 @@ def element_stiffness_triangle(node_coords, k=1.0):
     x1, y1 = node_coords[0, 0], node_coords[0, 1]
     x2, y2 = node_coords[1, 0], node_coords[1, 1]
     x3, y3 = node_coords[2, 0], node_coords[2, 1]
-    area = 0.5 * np.linalg.det( np.array([
-    [1, x1, y1],
-    [1, x2, y2],
-    [1, x3, y3],
-     ]) )# element area
+    # element area via the 2D cross product of the edge vectors
+    # (same value as the 3x3 determinant, without the LAPACK call)
+    two_area = (x2 - x1) * (y3 - y1) - (x3 - x1) * (y2 - y1)
+    area = 0.5 * two_area
 
     # Shape function derivatives (constant over element)
-    B = (1/(2*area)) * np.array([
+    B = np.array([
     [y2-y3, y3-y1, y1-y2],
-    [x3-x2, x1-x3, x2-x1],]) #matrix B
+    [x3-x2, x1-x3, x2-x1],]) / two_area #matrix B
     Ke = k * area * (B.T @ B)
     return Ke
 
 
+def _batch_element_ke(nodes, elems, k=1.0):
+    """
+    Element stiffness matrices of all triangles at once, shape (M,3,3).
+    """
+    coords = nodes[elems, :2]  # (M,3,2), take x,y only
+    x = coords[:, :, 0]
+    y = coords[:, :, 1]
+    area = 0.5 * ((x[:, 1] - x[:, 0]) * (y[:, 2] - y[:, 0])
+                  - (x[:, 2] - x[:, 0]) * (y[:, 1] - y[:, 0]))  # element areas
+
+    # B matrices (M,2,3), rows = shape function derivatives (without 1/(2A))
+    B = np.stack((
+        np.stack((y[:, 1] - y[:, 2], y[:, 2] - y[:, 0], y[:, 0] - y[:, 1]), axis=1),
+        np.stack((x[:, 2] - x[:, 1], x[:, 0] - x[:, 2], x[:, 1] - x[:, 0]), axis=1),
+    ), axis=1)
+
+    # Ke = k*A * (B/(2A)).T @ (B/(2A)) = k/(4A) * B.T @ B, batched over elements
+    return (k / (4.0 * area))[:, None, None] * np.einsum('eki,ekj->eij', B, B)
+
+
+class AssemblyPattern:
+    """
+    Cached sparsity pattern of the global stiffness matrix for a fixed mesh.
+    Building the CSR structure (sort + duplicate merge) is the expensive part
+    of assembly; when the mesh does not change between solves (time stepping,
+    nonlinear iterations, material sweeps), do it once here and then each
+    assemble() call only scatters new element values into the cached slots.
+    """
+
+    def __init__(self, elems, nnodes):
+        nelems = elems.shape[0]
+        rows = np.broadcast_to(elems[:, :, None], (nelems, 3, 3)).ravel()
+        cols = np.broadcast_to(elems[:, None, :], (nelems, 3, 3)).ravel()
+        ncoo = rows.size
+
+        # sort triplets into CSR order and merge duplicate (row, col) pairs
+        order = np.lexsort((cols, rows))
+        r_sorted = rows[order]
+        c_sorted = cols[order]
+        first = np.empty(ncoo, dtype=bool)
+        first[0] = True
+        first[1:] = (r_sorted[1:] != r_sorted[:-1]) | (c_sorted[1:] != c_sorted[:-1])
+
+        # slot[t] = CSR data position of the t-th COO triplet
+        slot = np.empty(ncoo, dtype=np.intp)
+        slot[order] = np.cumsum(first) - 1
+
+        self.nnodes = nnodes
+        self.elems = elems
+        self.slot = slot
+        self.indices = c_sorted[first].astype(np.int32)
+        self.indptr = np.zeros(nnodes + 1, dtype=np.int32)
+        np.cumsum(np.bincount(r_sorted[first], minlength=nnodes),
+                  out=self.indptr[1:])
+        self.nnz = self.indices.size
+
+    def assemble_values(self, nodes, k=1.0):
+        """
+        Recompute only the CSR data array for new coordinates and/or k.
+        Callers sweeping over materials can pair this with the cached
+        indices/indptr to build csr_matrix themselves without any COO pass.
+        """
+        Ke = _batch_element_ke(nodes, self.elems, k)
+        data = np.zeros(self.nnz)
+        np.add.at(data, self.slot, Ke.ravel())
+        return data
+
+    def assemble(self, nodes, k=1.0):
+        """Assemble K on the cached pattern; only the values are recomputed."""
+        data = self.assemble_values(nodes, k)
+        return sp.csr_matrix((data, self.indices, self.indptr),
+                             shape=(self.nnodes, self.nnodes))
+
+
+def build_global_indices(elems, nnodes):
+    """
+    Cache the purely topological part of assembly (COO slots, CSR
+    indices/indptr); depends only on the connectivity, not on the node
+    coordinates or k. Returns an AssemblyPattern.
+    """
+    return AssemblyPattern(elems, nnodes)
+
+
 def assemble_global(nodes, elems, k=1.0):
     """
     Assemble global stiffness matrix for triangular mesh
@@ -48,126 +178,302 @@ def assemble_global(nodes, elems, k=1.0):
     """
     nnodes = nodes.shape[0]
     nelems = elems.shape[0]
-    rows = []
-    cols = []
-    data = []
-
-    for e in range(nelems):
-        conn = elems[e]
-        coords = nodes[conn, :2]  # take x,y only
-        Ke = element_stiffness_triangle(coords, k=k)
-        for i_local, i_global in enumerate(conn):
-            for j_local, j_global in enumerate(conn):
-                rows.append(i_global)
-                cols.append(j_global)
-                data.append(Ke[i_local,j_local])
-    K = sp.coo_matrix((data,(rows,cols)), shape=(nnodes, nnodes)).tocsr()
-    
-    
+
+    if nelems == 1:
+        # scalar fallback for single-element callers
+        Ke = element_stiffness_triangle(nodes[elems[0], :2], k=k)
+        conn = elems[0]
+        rows = np.repeat(conn, 3)
+        cols = np.tile(conn, 3)
+        return _coo_to_csr(rows, cols, Ke.ravel(), nnodes)
+
+    if _assembly_backend is not None:
+        # compiled kernel: native parallel loop over elements, no NumPy dispatch
+        rows, cols, data = _assembly_backend.assemble_coo(nodes, elems, k)
+        return _coo_to_csr(rows, cols, data, nnodes)
+
+    Ke = _batch_element_ke(nodes, elems, k)
+
+    # global (row, col) index pairs for all 9*M entries via broadcasting
+    I = np.broadcast_to(elems[:, :, None], (nelems, 3, 3))
+    J = np.broadcast_to(elems[:, None, :], (nelems, 3, 3))
+
+    K = _coo_to_csr(I.ravel(), J.ravel(), Ke.ravel(), nnodes)
     return K
 
 
-def apply_dirichlet(K, f, bc_nodes, bc_values):
+def build_coo(nodes, elems, k=1.0, heat_flux_bcs=None, conv_bcs=None):
+    """
+    Collect ALL COO contributions (volume conduction + convection edges)
+    and the load vector (incl. heat-flux edges) in one buffer, so the
+    caller compresses to CSR exactly once.
+    returns: rows, cols, data, f
+    """
+    nnodes = nodes.shape[0]
+    nelems = elems.shape[0]
+    f = np.zeros(nnodes)
+
+    if _assembly_backend is not None:
+        rows, cols, data = _assembly_backend.assemble_coo(nodes, elems, k)
+    else:
+        Ke = _batch_element_ke(nodes, elems, k)
+        rows = np.broadcast_to(elems[:, :, None], (nelems, 3, 3)).ravel()
+        cols = np.broadcast_to(elems[:, None, :], (nelems, 3, 3)).ravel()
+        data = Ke.ravel()
+
+    if heat_flux_bcs is not None and len(heat_flux_bcs):
+        f = apply_heat_flux(f, nodes, elems, heat_flux_bcs)
+    if conv_bcs is not None and len(conv_bcs):
+        rows_c, cols_c, data_c = convection_edge_triplets(f, nodes, elems, conv_bcs)
+        rows = np.concatenate([rows, rows_c])
+        cols = np.concatenate([cols, cols_c])
+        data = np.concatenate([data, data_c])
+
+    return rows, cols, data, f
+
+
+def assemble_system(nodes, elems, k=1.0, heat_flux_bcs=None, conv_bcs=None):
+    """
+    Assemble the global system with Neumann/Robin BCs folded into one
+    COO build and a single CSR conversion.
+    returns: K (CSR), f
+    """
+    rows, cols, data, f = build_coo(nodes, elems, k, heat_flux_bcs, conv_bcs)
+    K = _coo_to_csr(rows, cols, data, nodes.shape[0])
+    return K, f
+
+
+def apply_dirichlet(K, f, bc_nodes, bc_values, copy=False):
     """
     Apply Dirichlet boundary conditions to the global matrix
     bc_nodes: array of node indices
     bc_values: array of prescribed values
+    copy: work on copies of K and f instead of modifying them in place
     """
-    K = K.tolil(copy=True)
-    f = f.copy()
-   
+    if copy:
+        K = K.copy()
+        f = f.copy()
+    bc_nodes = np.asarray(bc_nodes, dtype=K.indices.dtype)
+    bc_values = np.asarray(bc_values, dtype=float)
+    # a node listed twice (e.g. a corner shared by two boundary groups)
+    # must subtract its column from f only once — the CSC view below is
+    # taken before any zeroing, so deduplicate on first occurrence
+    _, first = np.unique(bc_nodes, return_index=True)
+    first.sort()
+    bc_nodes = bc_nodes[first]
+    bc_values = bc_values[first]
+    K.sort_indices()
+
+    # move prescribed values to the RHS: read bc columns through a CSC view
+    Kcsc = K.tocsc()
     for node, val in zip(bc_nodes, bc_values):
-        col = K[:, node].toarray().ravel()
-        f -= col * val
-        K[node, :] = 0
-        K[:, node] = 0
-        K[node, node] = 1
-        f[node] = val
+        start, end = Kcsc.indptr[node], Kcsc.indptr[node + 1]
+        np.subtract.at(f, Kcsc.indices[start:end], Kcsc.data[start:end] * val)
 
+    # zero bc rows in-place on the CSR data
+    for node in bc_nodes:
+        K.data[K.indptr[node]:K.indptr[node + 1]] = 0
+    # zero all bc columns with one vectorized mask
+    K.data[np.isin(K.indices, bc_nodes)] = 0
+
+    # unit diagonal on bc rows; usually the entry is structurally present
+    # (just zeroed), but a node unused by any element has an empty row,
+    # so verify the slot before writing and insert structurally otherwise
+    no_diag = []
+    for node in bc_nodes:
+        start, end = K.indptr[node], K.indptr[node + 1]
+        row_cols = K.indices[start:end]
+        pos = np.searchsorted(row_cols, node)
+        if pos < row_cols.size and row_cols[pos] == node:
+            K.data[start + pos] = 1.0
+        else:
+            no_diag.append(node)
+
+    f[bc_nodes] = bc_values
+    K.eliminate_zeros()
+    for node in no_diag:
+        K[node, node] = 1.0
+    # rows and columns are zeroed in matching pairs, so a symmetric K
+    # stays symmetric and CG remains applicable downstream
     return K, f
 
-def apply_dirichlet_penalty(K, f, bc_nodes, bc_values, alpha):
-    K = K.tolil(copy=True)
-    f = f.copy()
-    for node, val in zip(bc_nodes, bc_values):
-        K[node, node] += alpha
-        f[node] += alpha * val
-    
-    K_max = abs(K).max()
+def apply_dirichlet_penalty(K, f, bc_nodes, bc_values, alpha, copy=False):
+    if copy:
+        K = K.copy()
+        f = f.copy()
+    bc_nodes = np.asarray(bc_nodes, dtype=K.indices.dtype)
+    bc_values = np.asarray(bc_values, dtype=float)
+    K.sort_indices()
+
+    # bump the bc diagonals by alpha; a bc row without a structural
+    # diagonal (node unused by any element) is collected and inserted,
+    # same guard as in apply_dirichlet
+    no_diag = []
+    for node in bc_nodes:
+        start, end = K.indptr[node], K.indptr[node + 1]
+        row_cols = K.indices[start:end]
+        pos = np.searchsorted(row_cols, node)
+        if pos < row_cols.size and row_cols[pos] == node:
+            K.data[start + pos] += alpha
+        else:
+            no_diag.append(node)
+    for node in no_diag:
+        K[node, node] = K[node, node] + alpha  # structural insert
+    np.add.at(f, bc_nodes, alpha * bc_values)
+
+    K_max = np.abs(K.data).max()  # no abs(K) sparse temporary
     C = K_max * 1e4
-    for node, val in zip(bc_nodes, bc_values):
-        K[node, node] += C
-        f[node] += C * val
-    return K.tocsr(), f
+
+    # every bc diagonal is structurally present now; locate once and update
+    K.sort_indices()
+    diag_idx = np.array([
+        K.indptr[n] + np.searchsorted(K.indices[K.indptr[n]:K.indptr[n + 1]], n)
+        for n in bc_nodes
+    ], dtype=np.intp)
+    np.add.at(K.data, diag_idx, C)
+    np.add.at(f, bc_nodes, C * bc_values)
+    return K, f
 
 def apply_heat_flux(f, nodes, elems, heat_flux_bcs):
     """
     Apply Neumann (heat flux) BCs to load vector.
     Each BC: (elem_id, edge_id, q)
     """
-    for elem_id, edge_id, q in heat_flux_bcs:
-        conn = elems[elem_id]
-        coords = nodes[conn, :2]
-        edge_nodes = {
-            1: [0,1],
-            2: [1,2],
-            3: [2,0]
-        }[edge_id]
-        n1, n2 = edge_nodes
-        x1, y1 = coords[n1]
-        x2, y2 = coords[n2]
-        L = np.hypot(x2-x1, y2-y1)
-        fe = q * L * np.array([0.5, 0.5]) # linear edge shape functions
-        f[conn[edge_nodes]] += fe
+    bc = np.asarray(heat_flux_bcs, dtype=float).reshape(-1, 3)
+    elem_ids = bc[:, 0].astype(int)
+    edge_ids = bc[:, 1].astype(int)
+    q = bc[:, 2]
+
+    conn = elems[elem_ids]                            # (Nb,3)
+    pair = _EDGE_LOCAL[edge_ids - 1]                  # (Nb,2) local node pairs
+    gnodes = np.take_along_axis(conn, pair, axis=1)   # (Nb,2) global node ids
+    p = nodes[gnodes, :2]                             # (Nb,2,2) edge endpoints
+    L = np.hypot(p[:, 1, 0] - p[:, 0, 0], p[:, 1, 1] - p[:, 0, 1])
+
+    fe = np.repeat(0.5 * q * L, 2)  # linear edge shape functions
+    np.add.at(f, gnodes.ravel(), fe)
     return f
 
 
-def apply_convection(K, f, nodes, elems, conv_bcs):
+def convection_edge_triplets(f, nodes, elems, conv_bcs):
+    """
+    Vectorized Robin (convection) edge contributions.
+    Adds the load-vector part into f in-place and returns the matrix
+    part as COO triplets (rows, cols, data) for a single global merge.
+    """
+    bc = np.asarray(conv_bcs, dtype=float).reshape(-1, 4)
+    nb = bc.shape[0]
+    if nb == 0:
+        empty_idx = np.empty(0, dtype=np.intp)
+        return empty_idx, empty_idx, np.empty(0)
+    elem_ids = bc[:, 0].astype(int)
+    edge_ids = bc[:, 1].astype(int)
+    h = bc[:, 2]
+    Tinf = bc[:, 3]
+
+    conn = elems[elem_ids]                            # (Nb,3)
+    pair = _EDGE_LOCAL[edge_ids - 1]                  # (Nb,2) local node pairs
+    gnodes = np.take_along_axis(conn, pair, axis=1)   # (Nb,2) global node ids
+    p = nodes[gnodes, :2]                             # (Nb,2,2) edge endpoints
+    L = np.hypot(p[:, 1, 0] - p[:, 0, 0], p[:, 1, 1] - p[:, 0, 1])
+
+    Ke_edge = (h * L / 6.0)[:, None, None] * np.array([[2.0, 1.0],
+                                                       [1.0, 2.0]])
+    fe_edge = np.repeat(h * Tinf * L / 2.0, 2)        # (2*Nb,)
+    np.add.at(f, gnodes.ravel(), fe_edge)
+
+    rows = np.broadcast_to(gnodes[:, :, None], (nb, 2, 2)).ravel()
+    cols = np.broadcast_to(gnodes[:, None, :], (nb, 2, 2)).ravel()
+    return rows, cols, Ke_edge.ravel()
+
+
+def apply_convection(K, f, nodes, elems, conv_bcs, copy=False):
     """
     Apply Robin (convection) BCs to load vector & matrix K.
     Each BC: (elem_id, edge_id, h, Tinf)
+    copy: accumulate the loads into a copy of f instead of in place
     """
-   
-    K = K.tolil(copy=True)
-    f = f.copy()
+    if copy:
+        f = f.copy()
+    rows, cols, data = convection_edge_triplets(f, nodes, elems, conv_bcs)
+    K = (K + sp.coo_matrix((data, (rows, cols)), shape=K.shape)).tocsr()
+    return K, f
 
-    edge_dict = {
-        1: (0, 1),  # edge 1: local nodes 0-1
-        2: (1, 2),  # edge 2: local nodes 1-2
-        3: (2, 0),  # edge 3: local nodes 2-0
-    }
-    for elem_id, edge_id, h, Tinf in conv_bcs:
-        conn = elems[elem_id]        #  [i, j, k]
-        coords = nodes[conn, :2]     # (x,y) of nodes
 
-        n1, n2 = edge_dict[edge_id]  # local nodes
+def _is_symmetric(K, rtol=1e-12):
+    """Cheap structural+value symmetry test on a sparse matrix."""
+    diff = abs(K - K.T)
+    if diff.nnz == 0:
+        return True
+    return diff.max() <= rtol * abs(K).max()
 
-        x1, y1 = coords[n1]
-        x2, y2 = coords[n2]
 
-        
-        L = np.hypot(x2 - x1, y2 - y1)
+def _solve_mixed_precision(K, f, tol=1e-10, inner_rtol=1e-5, max_refine=10):
+    """
+    FP32 Krylov iterations wrapped in FP64 iterative refinement.
+    SpMV dominates iterative solves and is memory-bound, so running the
+    Krylov loop on an FP32 copy of K halves the bandwidth per iteration;
+    full accuracy is recovered by refining the FP64 residual.
+    """
+    K32 = K.astype(np.float32)
+    if _is_symmetric(K):
+        solver = spla.cg
+    else:
+        solver = spla.bicgstab
+    d = K32.diagonal()
+    M = spla.LinearOperator(K32.shape, lambda x: x / d, dtype=np.float32)
 
-        
-        Ke_edge = (h * L / 6.0) * np.array([[2.0, 1.0],
-                                            [1.0, 2.0]])
+    u = np.zeros(K.shape[0])
+    r = np.asarray(f, dtype=np.float64).copy()
+    f_norm = np.linalg.norm(r)
+    if f_norm == 0.0:
+        return u
+    for _ in range(max_refine):
+        du, _info = solver(K32, r.astype(np.float32), M=M, rtol=inner_rtol)
+        u += du.astype(np.float64)
+        r = f - K @ u  # FP64 residual drives the refinement
+        if np.linalg.norm(r) <= tol * f_norm:
+            return u
+    raise RuntimeError("mixed-precision refinement did not converge")
 
-        
-        fe_edge = (h * Tinf * L / 2.0) * np.array([1.0, 1.0])
 
-        edge_local = [n1, n2]
+def solve_system(K, f, method='auto', tol=1e-10):
+    """
+    Solve the linear system Ku=f.
+    method: 'auto'     - direct below ~50k dofs; above, CG+Jacobi when K
+                         is symmetric, else ILU(0)+BiCGStab
+            'direct'   - SuperLU factorization (spsolve)
+            'cg'       - conjugate gradients + Jacobi (symmetric K only)
+            'bicgstab' - BiCGStab + ILU(0)
+            'mixed'    - FP32 Krylov + FP64 iterative refinement
+    """
+    K = sp.csr_matrix(K)
+    if method == 'auto':
+        if K.shape[0] <= 50_000:
+            method = 'direct'
+        else:
+            # CG iterations cost about half of BiCGStab; use them when
+            # the operator is symmetric (assembly + symmetric Dirichlet)
+            method = 'cg' if _is_symmetric(K) else 'bicgstab'
 
-        # assembly global
-        for i_local, i_loc in enumerate(edge_local):
-            I = conn[i_loc]          # global node index
-            f[I] += fe_edge[i_local]
-            for j_local, j_loc in enumerate(edge_local):
-                J = conn[j_loc]
-                K[I, J] += Ke_edge[i_local, j_local]
-    return K.tocsr(), f
+    if method == 'direct':
+        return spla.spsolve(K, f)
 
+    if method == 'mixed':
+        return _solve_mixed_precision(K, f, tol=tol)
 
-def solve_system(K, f):
-    """Solve the linear system Ku=f"""
-    u = spla.spsolve(K, f)
+    if method == 'cg':
+        # CG needs an SPD preconditioner; scipy's ILU is not symmetric,
+        # so precondition with the (Jacobi) diagonal instead
+        d = K.diagonal()
+        M = spla.LinearOperator(K.shape, lambda x: x / d)
+        solver = spla.cg
+    else:
+        # ILU(0): factorize on the existing sparsity pattern, no extra fill-in
+        ilu = spla.spilu(K.tocsc(), drop_tol=0.0, fill_factor=1)
+        M = spla.LinearOperator(K.shape, ilu.solve)
+        solver = spla.bicgstab
+    u, info = solver(K, f, M=M, rtol=tol)
+    if info != 0:
+        raise RuntimeError(f"iterative solver did not converge (info={info})")
     return u
@@ -8,8 +8,7 @@ Main Script
 """
 import numpy as np
 from PreProcessor import read_input_file
-from Solver import assemble_global, apply_convection, apply_dirichlet
-from Solver import apply_heat_flux, solve_system
+from Solver import assemble_system, apply_dirichlet, solve_system
 from PostProcessor import plot_mesh, plot_mesh_interactive, plot_temperature_field
 from PostProcessor import export_temperature_csv
 
@@ -19,31 +18,24 @@ def main():
     feb_file = "validation.semfe"   # ή όποιο όνομα έχεις
     nodes, elems, materials, k, bcs = read_input_file(feb_file)
 
-    # 2. Συναρμολόγηση global K και f
-    K = assemble_global(nodes, elems, k)
-    f = np.zeros(nodes.shape[0])
+    # 2. Συναρμολόγηση global K και f σε ένα COO build:
+    #    volume + Neumann (heat flux) + Convection (Robin) BCs,
+    #    μία μόνο μετατροπή σε CSR
+    K, f = assemble_system(nodes, elems, k,
+                           heat_flux_bcs=bcs.get("heat_flux"),
+                           conv_bcs=bcs.get("convection"))
 
-    # 3. Εφαρμογή Neumann (heat flux) BCs
-    #    bcs['heat_flux'] είναι λίστα (elem_id, edge_id, q)
-    if bcs.get("heat_flux"):
-        f = apply_heat_flux(f, nodes, elems, bcs["heat_flux"])
-
-    # 4. Εφαρμογή Convection (Robin) BCs
-    #    bcs['convection'] είναι λίστα (elem_id, edge_id, h, Tinf)
-    if bcs.get("convection"):
-        K, f = apply_convection(K, f, nodes, elems, bcs["convection"])
-
-    # 5. Εφαρμογή Dirichlet (Temperature) BCs
+    # 3. Εφαρμογή Dirichlet (Temperature) BCs
     #    bcs['temperature'] είναι λίστα (node, value)
     if bcs.get("temperature"):
         bc_nodes  = [node for node, val in bcs["temperature"]]
         bc_values = [val  for node, val in bcs["temperature"]]
         K, f = apply_dirichlet(K, f, bc_nodes, bc_values)
 
-    # 6. Λύση συστήματος
+    # 4. Λύση συστήματος
     u = solve_system(K, f)
 
-    # 7. Post-processing
+    # 5. Post-processing
     #    (αν θες, ξεσχολιάζεις και το plot_mesh / plot_mesh_interactive)
     plot_mesh(nodes, elems, filename="mesh.png")
     plot_mesh_interactive(nodes, elems)
@@ -6,7 +6,7 @@ Chimney mesh + SEMFE XML creator
 - triangular elements (tri3)
 """
 
-from collections import defaultdict
+import numpy as np
 
 # -----------------------------
 # ΓΕΩΜΕΤΡΙΑ ΚΑΜΙΝΑΔΑΣ
@@ -38,8 +38,8 @@ def generate_chimney_mesh(nx=20, ny=15):
     και κάθε cell το κόβει σε 2 τρίγωνα.
 
     Επιστρέφει:
-    - nodes: λίστα [(x,y), ...]
-    - elems: λίστα [(n1,n2,n3), ...] με 0-based indices κόμβων
+    - nodes: (N,2) array [(x,y), ...]
+    - elems: (M,3) array [(n1,n2,n3), ...] με 0-based indices κόμβων
     """
 
     dx = OUTER_W / nx
@@ -48,39 +48,32 @@ def generate_chimney_mesh(nx=20, ny=15):
     n_nodes_x = nx + 1
     n_nodes_y = ny + 1
 
-    # ----- κόμβοι -----
-    nodes = []
-    for j in range(n_nodes_y):
-        for i in range(n_nodes_x):
-            x = i * dx
-            y = j * dy
-            nodes.append((x, y))
-
-    # helper: index κόμβου (i,j) → global id
-    def nid(i, j):
-        return j * n_nodes_x + i
+    # ----- κόμβοι (meshgrid, ίδια row-major σειρά με το παλιό loop) -----
+    xs = np.arange(n_nodes_x) * dx
+    ys = np.arange(n_nodes_y) * dy
+    X, Y = np.meshgrid(xs, ys)
+    nodes = np.column_stack([X.ravel(), Y.ravel()])
 
     # ----- στοιχεία (triangles) -----
-    elems = []
-    for j in range(ny):
-        for i in range(nx):
-            # κέντρο του cell
-            xc = (i + 0.5) * dx
-            yc = (j + 0.5) * dy
-
-            # αν το κέντρο είναι μέσα στο εσωτερικό ορθογώνιο → skip
-            if (HOLE_X1 < xc < HOLE_X2) and (HOLE_Y1 < yc < HOLE_Y2):
-                continue
-
-            # κόμβοι cell (τετράπλευρο)
-            n1 = nid(i,   j)
-            n2 = nid(i+1, j)
-            n3 = nid(i+1, j+1)
-            n4 = nid(i,   j+1)
-
-            # 2 τρίγωνα (n1,n2,n4) και (n2,n3,n4)
-            elems.append((n1, n2, n4))
-            elems.append((n2, n3, n4))
+    ii, jj = np.meshgrid(np.arange(nx), np.arange(ny))
+
+    # κέντρα των cells → mask για την οπή
+    xc = (ii + 0.5) * dx
+    yc = (jj + 0.5) * dy
+    keep = ~((HOLE_X1 < xc) & (xc < HOLE_X2) & (HOLE_Y1 < yc) & (yc < HOLE_Y2))
+    ii = ii[keep]
+    jj = jj[keep]
+
+    # κόμβοι cell (τετράπλευρο) με index arithmetic
+    n1 = jj * n_nodes_x + ii
+    n2 = n1 + 1
+    n3 = n2 + n_nodes_x
+    n4 = n1 + n_nodes_x
+
+    # 2 τρίγωνα (n1,n2,n4) και (n2,n3,n4), interleaved όπως στο παλιό loop
+    elems = np.empty((2 * n1.size, 3), dtype=np.int64)
+    elems[0::2] = np.column_stack([n1, n2, n4])
+    elems[1::2] = np.column_stack([n2, n3, n4])
 
     return nodes, elems
 
@@ -92,28 +85,25 @@ def find_boundary_edges(nodes, elems):
     """
     Βρίσκει όλες τις ακμές που ανήκουν σε μόνο 1 τρίγωνο → boundary edges.
 
-    Επιστρέφει λίστα (a, b, elem_id, local_edge_id)
+    Επιστρέφει (Nb,4) int array με στήλες (a, b, elem_id, local_edge_id)
     """
-    edge_map = defaultdict(list)
+    elems_arr = np.asarray(elems, dtype=np.int64)
+    nelems = elems_arr.shape[0]
 
-    for e_idx, (n1, n2, n3) in enumerate(elems):
-        # τοπικές ακμές με local ID 1–3
-        edges = [
-            (n1, n2, 1),
-            (n2, n3, 2),
-            (n3, n1, 3),
-        ]
-        for a, b, local in edges:
-            key = (min(a, b), max(a, b))  # χωρίς κατεύθυνση
-            edge_map[key].append((e_idx, local))
+    # όλες οι τοπικές ακμές (local ID 1–3) σε element-major σειρά: (3M,2)
+    edges_all = np.stack([elems_arr[:, [0, 1]],
+                          elems_arr[:, [1, 2]],
+                          elems_arr[:, [2, 0]]], axis=1).reshape(-1, 2)
+    e_idx = np.repeat(np.arange(nelems), 3)
+    local = np.tile(np.array([1, 2, 3]), nelems)
 
-    boundary_edges = []
-    for (a, b), owners in edge_map.items():
-        if len(owners) == 1:  # μόνο ένα στοιχείο → σύνορο
-            e_idx, local = owners[0]
-            boundary_edges.append((a, b, e_idx, local))
+    # χωρίς κατεύθυνση → sorted ζεύγη, μοναδικές ακμές μέσω np.unique
+    key = np.sort(edges_all, axis=1)
+    _, inverse, counts = np.unique(key, axis=0,
+                                   return_inverse=True, return_counts=True)
+    mask = counts[inverse] == 1  # μόνο ένα στοιχείο → σύνορο
 
-    return boundary_edges
+    return np.column_stack([key[mask], e_idx[mask], local[mask]])
 
 
 # ---------------------------------------------------------
@@ -129,28 +119,23 @@ def classify_edges(nodes, bnd):
     - inner  (ακμές γύρω από την τρύπα)
     """
     tol = 1e-10
-    bottom = []
-    right_ext = []
-    top_ext = []
-    left_ext = []
-    inner = []
-
-    for (a, b, e_idx, loc) in bnd:
-        x1, y1 = nodes[a]
-        x2, y2 = nodes[b]
-
-        if abs(y1) < tol and abs(y2) < tol:
-            bottom.append((a, b, e_idx, loc))
-        elif abs(x1 - OUTER_W) < tol and abs(x2 - OUTER_W) < tol:
-            right_ext.append((a, b, e_idx, loc))
-        elif abs(y1 - OUTER_H) < tol and abs(y2 - OUTER_H) < tol:
-            top_ext.append((a, b, e_idx, loc))
-        elif abs(x1) < tol and abs(x2) < tol:
-            left_ext.append((a, b, e_idx, loc))
-        else:
-            inner.append((a, b, e_idx, loc))
-
-    return bottom, right_ext, top_ext, left_ext, inner
+    nodes_arr = np.asarray(nodes)
+
+    # SoA: συντεταγμένες και των δύο άκρων κάθε ακμής με fancy indexing
+    x1 = nodes_arr[bnd[:, 0], 0]
+    y1 = nodes_arr[bnd[:, 0], 1]
+    x2 = nodes_arr[bnd[:, 1], 0]
+    y2 = nodes_arr[bnd[:, 1], 1]
+
+    # boolean masks αντί για Python loop· η σειρά αντιστοιχεί στο
+    # παλιό if/elif, οπότε κάθε ακμή μπαίνει σε μία μόνο ομάδα
+    bottom_m = (np.abs(y1) < tol) & (np.abs(y2) < tol)
+    right_m = ~bottom_m & (np.abs(x1 - OUTER_W) < tol) & (np.abs(x2 - OUTER_W) < tol)
+    top_m = ~bottom_m & ~right_m & (np.abs(y1 - OUTER_H) < tol) & (np.abs(y2 - OUTER_H) < tol)
+    left_m = ~bottom_m & ~right_m & ~top_m & (np.abs(x1) < tol) & (np.abs(x2) < tol)
+    inner_m = ~(bottom_m | right_m | top_m | left_m)
+
+    return bnd[bottom_m], bnd[right_m], bnd[top_m], bnd[left_m], bnd[inner_m]
 
 
 # ---------------------------------------------------------
@@ -162,24 +147,26 @@ def cleanup(nodes, elems, bottom, right, top, left, inner):
     2) Κάνει reindex ώστε οι κόμβοι να είναι 0..N-1 χωρίς κενά.
     3) Ενημερώνει αντίστοιχα elems & boundary edges.
     """
-    # ποιοι κόμβοι χρησιμοποιούνται
-    used = set()
-    for n1, n2, n3 in elems:
-        used.update([n1, n2, n3])
+    nodes_arr = np.asarray(nodes)
+    elems_arr = np.asarray(elems, dtype=np.int64)
 
-    used = sorted(list(used))
-    mapping = {old: new for new, old in enumerate(used)}
+    # ποιοι κόμβοι χρησιμοποιούνται + νέα αρίθμηση, όλα vectorized
+    used = np.unique(elems_arr)
+    mapping = np.full(nodes_arr.shape[0], -1, dtype=np.int64)
+    mapping[used] = np.arange(used.size)
 
     # νέοι κόμβοι (μόνο οι used, με νέα αρίθμηση)
-    new_nodes = [nodes[i] for i in used]
+    new_nodes = nodes_arr[used]
 
     # νέα στοιχεία με reindexed κόμβους
-    new_elems = [(mapping[a], mapping[b], mapping[c]) for (a, b, c) in elems]
+    new_elems = mapping[elems_arr]
 
-    # helper για reindex στα edges
+    # helper για reindex στα edges (στήλες a, b)
     def remap(edges):
-        return [(mapping[a], mapping[b], e_idx, local)
-                for (a, b, e_idx, local) in edges]
+        out = edges.copy()
+        out[:, 0] = mapping[edges[:, 0]]
+        out[:, 1] = mapping[edges[:, 1]]
+        return out
 
     return (
         new_nodes,
@@ -218,18 +205,20 @@ def write_xml(filename, nodes, elems, bottom, right, top, inner):
         f.write('    </Material>\n')
         f.write('  </Materials>\n\n')
 
-        # GEOMETRY: NODES
+        # GEOMETRY: NODES (μία γραμμή ανά κόμβο, ένα write συνολικά)
         f.write('  <Geometry>\n')
         f.write('    <Nodes>\n')
-        for i, (x, y) in enumerate(nodes, start=1):
-            f.write(f'      <node id="{i}" x="{x}" y="{y}" z="0.0"/>\n')
+        node_lines = [f'      <node id="{i}" x="{x}" y="{y}" z="0.0"/>'
+                      for i, (x, y) in enumerate(nodes, start=1)]
+        f.write("\n".join(node_lines) + "\n")
         f.write('    </Nodes>\n\n')
 
         # GEOMETRY: ELEMENTS
         f.write('    <Elements type="tri3" name="mesh">\n')
-        for e_id, (a, b, c) in enumerate(elems, start=1):
-            # +1 γιατί το SEMFE χρησιμοποιεί 1-based ids
-            f.write(f'      <elem id="{e_id}">{a+1} {b+1} {c+1}</elem>\n')
+        # +1 γιατί το SEMFE χρησιμοποιεί 1-based ids
+        elem_lines = [f'      <elem id="{e_id}">{a+1} {b+1} {c+1}</elem>'
+                      for e_id, (a, b, c) in enumerate(elems, start=1)]
+        f.write("\n".join(elem_lines) + "\n")
         f.write('    </Elements>\n')
         f.write('  </Geometry>\n\n')
 
@@ -242,30 +231,32 @@ def write_xml(filename, nodes, elems, bottom, right, top, inner):
         # Εσωτερικό τοίχωμα T = T_INNER
         inner_nodes = sorted({a for a, b, _, _ in inner} |
                              {b for a, b, _, _ in inner})
-        for n in inner_nodes:
-            f.write(f'      <temperature node="{n+1}" value="{T_INNER}"/>\n')
+        f.write("\n".join(
+            f'      <temperature node="{n+1}" value="{T_INNER}"/>'
+            for n in inner_nodes) + "\n")
 
         # Πάνω εξωτερικό T = T_TOP
         top_nodes = sorted({a for a, b, _, _ in top} |
                            {b for a, b, _, _ in top})
-        for n in top_nodes:
-            f.write(f'      <temperature node="{n+1}" value="{T_TOP}"/>\n')
+        f.write("\n".join(
+            f'      <temperature node="{n+1}" value="{T_TOP}"/>'
+            for n in top_nodes) + "\n")
 
         f.write('    </Boundary>\n\n')
 
         # ---- HEAT FLUX bottom = 0 ----
         f.write('    <HeatFlux>\n')
-        for (a, b, e_idx, local) in bottom:
-            f.write(f'      <flux elem="{e_idx+1}" edge="{local}" value="0.0"/>\n')
+        f.write("\n".join(
+            f'      <flux elem="{e_idx+1}" edge="{local}" value="0.0"/>'
+            for (a, b, e_idx, local) in bottom) + "\n")
         f.write('    </HeatFlux>\n\n')
 
         # ---- CONVECTION στο δεξί τοίχωμα ----
         f.write('    <Convection>\n')
-        for (a, b, e_idx, local) in right:
-            f.write(
-                f'      <conv elem="{e_idx+1}" edge="{local}" '
-                f'h="{H_CONV}" Tinf="{T_INF}"/>\n'
-            )
+        f.write("\n".join(
+            f'      <conv elem="{e_idx+1}" edge="{local}" '
+            f'h="{H_CONV}" Tinf="{T_INF}"/>'
+            for (a, b, e_idx, local) in right) + "\n")
         f.write('    </Convection>\n')
 
         f.write('  </BoundaryConditions>\n\n')
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+The SEMFE Heat Transfer Solver
+Computational Mechanics
+
+Build script for the optional Cython/OpenMP assembly extension:
+    python setup_ext.py build_ext --inplace
+"""
+
+import numpy as np
+from setuptools import Extension, setup
+from Cython.Build import cythonize
+
+ext = Extension(
+    "solver_ext",
+    sources=["solver_ext.pyx"],
+    include_dirs=[np.get_include()],
+    extra_compile_args=["-fopenmp", "-O3"],
+    extra_link_args=["-fopenmp"],
+    define_macros=[("NPY_NO_DEPRECATED_API", "NPY_1_7_API_VERSION")],
+)
+
+setup(name="solver_ext", ext_modules=cythonize([ext], language_level=3))